@@ -5,227 +5,311 @@ Simple web server to upload and process WhatsApp chat ZIP files.
 
 import os
 import socket
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import parse_qs, urlparse
-import cgi
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, quote
+import re
+import json
+import gzip
+import hashlib
+import tempfile
+from pathlib import PurePosixPath
+from functools import lru_cache
+import shutil
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as ConversionTimeout
 import sys
 import argparse
+import threading
+import uuid
+import traceback
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+import io
+import base64
 
-class UploadHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        """Serve the upload form, PWA assets, or download PDF"""
-        # Handle processing endpoint
-        if self.path.startswith('/process?'):
-            from urllib.parse import parse_qs, urlparse
-            
-            query = urlparse(self.path).query
-            params = parse_qs(query)
-            
-            filename = params.get('filename', [''])[0]
-            language = params.get('language', [''])[0]
-            
-            if not filename:
-                self.send_json_response({'success': False, 'error': 'No filename provided'})
-                return
-            
-            filepath = os.path.join('uploads', filename)
-            
-            if not os.path.exists(filepath):
-                self.send_json_response({'success': False, 'error': 'File not found'})
-                return
-            
-            # Process the file
-            try:
-                output_pdf = filename.replace('.zip', '_transcript.pdf')
-                output_path = os.path.join(os.getcwd(), output_pdf)
-                cmd = [sys.executable, 'main.py', filepath, '-o', output_path]
-                
-                if language:
-                    cmd.extend(['-l', language])
-                
-                print(f"Running: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-                print(f"Return code: {result.returncode}")
-                print(f"Output file exists: {os.path.exists(output_path)}")
-                
-                if result.returncode == 0 and os.path.exists(output_path):
-                    # Return PDF directly
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/pdf')
-                    self.send_header('Content-Disposition', f'attachment; filename="{output_pdf}"')
-                    self.send_header('Content-Length', str(os.path.getsize(output_path)))
-                    self.end_headers()
-                    
-                    with open(output_path, 'rb') as f:
-                        self.wfile.write(f.read())
-                    
-                    # Clean up
-                    os.remove(output_path)
-                    return
-                else:
-                    error_msg = result.stderr if result.stderr else 'Unknown error'
-                    self.send_json_response({
-                        'success': False,
-                        'error': f'Processing failed: {error_msg}'
-                    })
-            
-            except subprocess.TimeoutExpired:
-                self.send_json_response({
-                    'success': False,
-                    'error': 'Processing timeout (>10 minutes)'
-                })
-            except Exception as e:
-                self.send_json_response({
-                    'success': False,
-                    'error': str(e)
-                })
-            finally:
-                # Clean up uploaded file
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-            
-            return
-        
-        # Serve icons
-        if self.path in ['/icon-192.png', '/icon-512.png']:
-            size = 192 if '192' in self.path else 512
-            self.send_response(200)
-            self.send_header('Content-type', 'image/png')
-            self.send_header('Cache-Control', 'public, max-age=31536000')
-            self.end_headers()
-            
-            try:
-                from PIL import Image, ImageDraw
-                import io
-                
-                # Create simple icon with gradient
-                img = Image.new('RGB', (size, size), color=(102, 126, 234))
-                draw = ImageDraw.Draw(img)
-                
-                # Draw white circle in center
-                margin = size // 4
-                draw.ellipse([margin, margin, size-margin, size-margin], fill='white', outline=(102, 126, 234), width=size//20)
-                
-                # Draw chat bubble symbol
-                chat_size = size // 3
-                chat_x = size // 2 - chat_size // 2
-                chat_y = size // 2 - chat_size // 2
-                draw.rounded_rectangle([chat_x, chat_y, chat_x + chat_size, chat_y + chat_size * 0.7], 
-                                       radius=size//15, fill=(102, 126, 234))
-                # Tail of bubble
-                tail_points = [(chat_x + chat_size * 0.3, chat_y + chat_size * 0.7),
-                              (chat_x + chat_size * 0.2, chat_y + chat_size * 0.9),
-                              (chat_x + chat_size * 0.4, chat_y + chat_size * 0.7)]
-                draw.polygon(tail_points, fill=(102, 126, 234))
-                
-                # Save to bytes
-                img_bytes = io.BytesIO()
-                img.save(img_bytes, format='PNG', optimize=True)
-                self.wfile.write(img_bytes.getvalue())
-            except ImportError:
-                # Fallback: simple solid color PNG if PIL not available
-                import base64
-                png_data = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
-                self.wfile.write(png_data)
-            return
-        
-        # Serve service worker
-        if self.path == '/sw.js':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/javascript')
-            self.end_headers()
-            
-            sw_code = """
-const CACHE_NAME = 'chat2pdf-v1';
+try:
+    from PIL import Image, ImageDraw
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+
+
+
+
+# Resumable upload sessions: id -> {'filename', 'size', 'received'}
+# (received is a sorted list of merged [start, end] byte ranges)
+_PARTIAL_DIR = os.path.join('uploads', '.partial')
+_resumable = {}
+_resumable_lock = threading.Lock()
+
+
+def _merge_ranges(ranges, start, end):
+    """Insert [start, end] and return the merged, sorted range list."""
+    ranges = sorted(ranges + [[start, end]])
+    merged = [ranges[0]]
+    for s, e in ranges[1:]:
+        if s <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return merged
+
+
+def _load_session(upload_id):
+    """Fetch a session from memory, falling back to its meta file."""
+    with _resumable_lock:
+        session = _resumable.get(upload_id)
+    if session is None:
+        meta_path = os.path.join(_PARTIAL_DIR, upload_id + '.meta.json')
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with _resumable_lock:
+            _resumable[upload_id] = session
+    return session
+
+
+def _save_session(upload_id, session):
+    with _resumable_lock:
+        _resumable[upload_id] = session
+    meta_path = os.path.join(_PARTIAL_DIR, upload_id + '.meta.json')
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(session, f)
+
+
+
+# Persistent conversion workers: re-spawning a fresh interpreter per
+# request paid the full import cost (reportlab, whisper, ...) every time
+_convert_pool = None
+
+# Access log: request threads only enqueue a record; the listener
+# thread owns the stream lock, so concurrent requests never block on
+# stdout flushes
+_log_queue = SimpleQueue()
+_access_log = logging.getLogger('web_upload.access')
+_access_log.setLevel(logging.INFO)
+_access_log.propagate = False
+_access_log.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+
+
+# Back-pressure: with two warm workers, allow at most two more queued
+# jobs; past that it is kinder to answer 429 than to queue minutes of
+# CPU work and risk piling model-sized processes onto the box
+_job_slots = threading.BoundedSemaphore(4)
+
+
+# Finished PDFs keyed by sha256 of the uploaded zip: re-uploading the
+# same export skips the whole conversion. Safe to delete at any time.
+_PDF_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pdf-cache')
+
+
+def _cached_pdf_path(digest, language):
+    # The language is part of the key: the same zip transcribed with a
+    # different language yields a different PDF. Client-supplied, so
+    # keep only filename-safe characters.
+    language = re.sub(r'[^A-Za-z0-9_-]', '', language or '')
+    suffix = '-' + language if language else ''
+    return os.path.join(_PDF_CACHE_DIR, digest + suffix + '.pdf')
+
+
+def _store_cached_pdf(cache_path, output_path):
+    """Copy a fresh PDF into the cache; a failure only costs the cache."""
+    try:
+        os.makedirs(_PDF_CACHE_DIR, exist_ok=True)
+        shutil.copyfile(output_path, cache_path + '.tmp')
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError:
+        pass
+
+
+def _advise_sequential(fd):
+    """Tell the kernel an fd will be written/read front to back.
+
+    Lets it size read-ahead and start writeback early; a no-op where
+    posix_fadvise is missing (Windows, macOS).
+    """
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _file_sha256(path):
+    """sha256 hex digest of a file, streamed in 1MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        _advise_sequential(f.fileno())
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# PDFs are written, sent once and unlinked, so stage them on tmpfs when
+# the platform has one and spare the disk a write+read round-trip
+_OUTPUT_STAGING_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def _staged_pdf_path():
+    """Reserve a unique output path for one conversion."""
+    fd, path = tempfile.mkstemp(suffix='_transcript.pdf', dir=_OUTPUT_STAGING_DIR)
+    os.close(fd)
+    return path
+
+
+def _get_convert_pool():
+    global _convert_pool
+    if _convert_pool is None:
+        _convert_pool = ProcessPoolExecutor(max_workers=2)
+    return _convert_pool
+
+
+def _convert_in_worker(zip_path, output_path, language):
+    """Run one conversion inside a pooled worker process."""
+    from main import _convert_one
+    return _convert_one(zip_path, output_path, language)
+
+
+def _finish_abandoned(future, cache_path, output_path):
+    """Tidy up after a conversion whose client stopped waiting.
+
+    The pool cannot kill a running job the way subprocess timeouts
+    could, so the worker grinds on after future.result() times out.
+    When it finally finishes, salvage the PDF into the cache, drop the
+    staged file and only then hand back the job slot.
+    """
+    try:
+        result = future.result()
+        if result.get('status') == 'success':
+            print(f"Timed-out conversion finished late, cached: {cache_path}")
+            _store_cached_pdf(cache_path, output_path)
+    except Exception:
+        pass
+    finally:
+        try:
+            os.unlink(output_path)
+        except FileNotFoundError:
+            pass
+        _job_slots.release()
+
+
+
+def _minify_html(text):
+    """Light import-time minification: drop indentation, blank lines and
+    full-line // comments. The inline JS keeps one statement per line, so
+    this is safe without a real parser."""
+    lines = []
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        lines.append(stripped)
+    return '\n'.join(lines)
+
+
+# Static PWA payloads, encoded once at import time
+_SW_JS = """
+const CACHE_NAME = 'chat2pdf-v2';
+const PRECACHE = ['/', '/manifest.json', '/icon-192.png', '/icon-512.png', '/static/processing.css'];
 
 self.addEventListener('install', (event) => {
-    console.log('Service Worker installed');
+    event.waitUntil(caches.open(CACHE_NAME).then(cache => cache.addAll(PRECACHE)));
     self.skipWaiting();
 });
 
 self.addEventListener('activate', (event) => {
-    console.log('Service Worker activated');
-    event.waitUntil(clients.claim());
+    event.waitUntil(
+        caches.keys().then(keys => Promise.all(
+            keys.filter(key => key !== CACHE_NAME).map(key => caches.delete(key))
+        )).then(() => clients.claim())
+    );
 });
 
 self.addEventListener('fetch', (event) => {
+    if (event.request.method !== 'GET') return;
+    const url = new URL(event.request.url);
+    if (url.pathname === '/process' || url.pathname.startsWith('/upload')) return;
+    // Stale-while-revalidate: answer from cache, refresh it in the background
     event.respondWith(
-        caches.match(event.request).then(response => {
-            return response || fetch(event.request);
-        })
+        caches.open(CACHE_NAME).then(cache =>
+            cache.match(event.request).then(cached => {
+                const refresh = fetch(event.request).then(response => {
+                    if (response.ok) cache.put(event.request, response.clone());
+                    return response;
+                }).catch(() => cached);
+                return cached || refresh;
+            })
+        )
     );
 });
-"""
-            self.wfile.write(sw_code.encode('utf-8'))
-            return
-        
-        # Serve manifest.json
-        if self.path == '/manifest.json':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            import json
-            manifest = {
-                "name": "WhatsApp Chat to PDF Converter",
-                "short_name": "Chat2PDF",
-                "description": "Convert WhatsApp chats to PDF with audio transcription",
-                "start_url": "/",
-                "scope": "/",
-                "display": "standalone",
-                "display_override": ["standalone", "fullscreen"],
-                "background_color": "#ffffff",
-                "theme_color": "#667eea",
-                "orientation": "portrait",
-                "prefer_related_applications": False,
-                "categories": ["productivity", "utilities"],
-                "icons": [
-                    {
-                        "src": "/icon-192.png",
-                        "sizes": "192x192",
-                        "type": "image/png",
-                        "purpose": "any"
-                    },
-                    {
-                        "src": "/icon-512.png",
-                        "sizes": "512x512",
-                        "type": "image/png",
-                        "purpose": "maskable"
-                    },
-                    {
-                        "src": "/icon-512.png",
-                        "sizes": "512x512",
-                        "type": "image/png",
-                        "purpose": "any"
-                    }
-                ],
-                "share_target": {
-                    "action": "/share",
-                    "method": "POST",
-                    "enctype": "multipart/form-data",
-                    "params": {
-                        "title": "title",
-                        "text": "text",
-                        "files": [
-                            {
-                                "name": "file",
-                                "accept": ["application/zip", "application/x-zip-compressed", ".zip"]
-                            }
-                        ]
-                    }
+""".encode('utf-8')
+
+_MANIFEST = {
+    "name": "WhatsApp Chat to PDF Converter",
+    "short_name": "Chat2PDF",
+    "description": "Convert WhatsApp chats to PDF with audio transcription",
+    "start_url": "/",
+    "scope": "/",
+    "display": "standalone",
+    "display_override": ["standalone", "fullscreen"],
+    "background_color": "#ffffff",
+    "theme_color": "#667eea",
+    "orientation": "portrait",
+    "prefer_related_applications": False,
+    "categories": ["productivity", "utilities"],
+    "icons": [
+        {
+            "src": "/icon-192.png",
+            "sizes": "192x192",
+            "type": "image/png",
+            "purpose": "any"
+        },
+        {
+            "src": "/icon-512.png",
+            "sizes": "512x512",
+            "type": "image/png",
+            "purpose": "maskable"
+        },
+        {
+            "src": "/icon-512.png",
+            "sizes": "512x512",
+            "type": "image/png",
+            "purpose": "any"
+        }
+    ],
+    "share_target": {
+        "action": "/share",
+        "method": "POST",
+        "enctype": "multipart/form-data",
+        "params": {
+            "title": "title",
+            "text": "text",
+            "files": [
+                {
+                    "name": "file",
+                    "accept": ["application/zip", "application/x-zip-compressed", ".zip"]
                 }
-            }
-            
-            self.wfile.write(json.dumps(manifest, indent=2).encode('utf-8'))
-            return
-        
-        if self.path == '/' or self.path == '/index.html':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            
-            html = """<!DOCTYPE html>
+            ]
+        }
+    }
+}
+
+_MANIFEST_JSON = json.dumps(_MANIFEST, indent=2).encode('utf-8')
+
+_INDEX_HTML = _minify_html("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -569,176 +653,19 @@ self.addEventListener('fetch', (event) => {
         });
     </script>
 </body>
-</html>"""
-            self.wfile.write(html.encode('utf-8'))
-            return
+</html>""").encode('utf-8')
 
-    def do_POST(self):
-        """Handle file upload"""
-        # Handle WhatsApp share
-        if self.path == '/share':
-            try:
-                # Parse multipart form data
-                content_type = self.headers['Content-Type']
-                if 'multipart/form-data' not in content_type:
-                    self.send_json_response({'success': False, 'error': 'Invalid content type'})
-                    return
+# Compressed variants, built once; text payloads shrink 3-5x and the
+# per-request cost is a header check (brotli would need a dependency)
+_SW_JS_GZ = gzip.compress(_SW_JS, 9)
+_MANIFEST_JSON_GZ = gzip.compress(_MANIFEST_JSON, 9)
+_INDEX_HTML_GZ = gzip.compress(_INDEX_HTML, 9)
 
-                # Create uploads directory
-                os.makedirs('uploads', exist_ok=True)
-
-                # Parse form data
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={'REQUEST_METHOD': 'POST'}
-                )
-
-                # Get file
-                if 'file' not in form:
-                    self.send_json_response({'success': False, 'error': 'No file uploaded'})
-                    return
-
-                fileitem = form['file']
-                if not fileitem.filename:
-                    self.send_json_response({'success': False, 'error': 'No file selected'})
-                    return
-
-                # Save file
-                filename = os.path.basename(fileitem.filename)
-                filepath = os.path.join('uploads', filename)
-                
-                with open(filepath, 'wb') as f:
-                    f.write(fileitem.file.read())
-
-                print(f"📱 File shared from WhatsApp: {filepath}")
-                
-                # Get language if specified
-                language = form.getvalue('language', '')
-                
-                # Show processing page
-                self.send_processing_page(filename, language)
-                return
-
-            except Exception as e:
-                print(f"Error: {e}")
-                import traceback
-                traceback.print_exc()
-                self.send_json_response({
-                    'success': False,
-                    'error': str(e)
-                })
-            return
-        
-        # Handle normal upload
-        if self.path == '/upload':
-            try:
-                # Parse multipart form data
-                content_type = self.headers['Content-Type']
-                if 'multipart/form-data' not in content_type:
-                    self.send_json_response({'success': False, 'error': 'Invalid content type'})
-                    return
-
-                # Create uploads directory
-                os.makedirs('uploads', exist_ok=True)
-
-                # Parse form data
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={'REQUEST_METHOD': 'POST'}
-                )
-
-                # Get file
-                if 'file' not in form:
-                    self.send_json_response({'success': False, 'error': 'No file uploaded'})
-                    return
-
-                fileitem = form['file']
-                if not fileitem.filename:
-                    self.send_json_response({'success': False, 'error': 'No file selected'})
-                    return
-
-                # Save file
-                filename = os.path.basename(fileitem.filename)
-                filepath = os.path.join('uploads', filename)
-                
-                with open(filepath, 'wb') as f:
-                    f.write(fileitem.file.read())
-
-                # Get language
-                language = form.getvalue('language', '')
-
-                # Process file
-                output_pdf = filename.replace('.zip', '_transcript.pdf')
-                output_path = os.path.join(os.getcwd(), output_pdf)
-                cmd = [sys.executable, 'main.py', filepath, '-o', output_path]
-                
-                if language:
-                    cmd.extend(['-l', language])
-
-                print(f"Running: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-
-                if result.returncode == 0 and os.path.exists(output_path):
-                    # Return PDF directly
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/pdf')
-                    self.send_header('Content-Disposition', f'attachment; filename="{output_pdf}"')
-                    self.send_header('Content-Length', str(os.path.getsize(output_path)))
-                    self.end_headers()
-                    
-                    with open(output_path, 'rb') as f:
-                        self.wfile.write(f.read())
-                    
-                    # Clean up
-                    os.remove(output_path)
-                else:
-                    error_msg = result.stderr if result.stderr else 'Unknown error'
-                    self.send_json_response({
-                        'success': False,
-                        'error': f'Processing failed: {error_msg}'
-                    })
-
-            except subprocess.TimeoutExpired:
-                self.send_json_response({
-                    'success': False,
-                    'error': 'Processing timeout (>10 minutes)'
-                })
-            except Exception as e:
-                print(f"Error: {e}")
-                import traceback
-                traceback.print_exc()
-                self.send_json_response({
-                    'success': False,
-                    'error': str(e)
-                })
-            finally:
-                # Clean up uploaded file
-                if 'filepath' in locals() and os.path.exists(filepath):
-                    os.remove(filepath)
-
-    def send_processing_page(self, filename, language):
-        """Send processing page that handles conversion and download"""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        
-        # URL encode filename for API call
-        from urllib.parse import quote
-        filename_encoded = quote(filename)
-        lang_param = f"&language={language}" if language else ""
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Processing...</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
+# Processing-page stylesheet, served separately so repeat sharers can
+# revalidate it with a 304 instead of re-downloading it inline
+_PROCESSING_CSS = _minify_html("""
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
@@ -746,8 +673,8 @@ self.addEventListener('fetch', (event) => {
             align-items: center;
             justify-content: center;
             padding: 20px;
-        }}
-        .container {{
+        }
+        .container {
             background: white;
             border-radius: 20px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.3);
@@ -755,13 +682,13 @@ self.addEventListener('fetch', (event) => {
             max-width: 500px;
             width: 100%;
             text-align: center;
-        }}
-        h1 {{
+        }
+        h1 {
             color: #333;
             margin-bottom: 20px;
             font-size: 24px;
-        }}
-        .spinner {{
+        }
+        .spinner {
             border: 4px solid #f3f3f3;
             border-top: 4px solid #667eea;
             border-radius: 50%;
@@ -769,38 +696,37 @@ self.addEventListener('fetch', (event) => {
             height: 60px;
             animation: spin 1s linear infinite;
             margin: 30px auto;
-        }}
-        @keyframes spin {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        .status {{
+        }
+        @keyframes spin {
+            0% { transform: rotate(0deg); }
+            100% { transform: rotate(360deg); }
+        }
+        .status {
             color: #666;
             margin: 20px 0;
             font-size: 16px;
-        }}
-        .filename {{
+        }
+        .filename {
             color: #333;
             font-weight: 600;
             margin: 10px 0;
             word-break: break-word;
-        }}
-        .success {{
+        }
+        .success {
             display: none;
             color: #4caf50;
             font-size: 48px;
             margin: 20px 0;
-        }}
-        .error {{
+        }
+        .error {
             display: none;
             background: #ffebee;
             color: #c62828;
             padding: 20px;
             border-radius: 10px;
             margin-top: 20px;
-        }}
-        .back-btn {{
-            display: none;
+        }
+        .back-btn {
             margin-top: 20px;
             padding: 12px 24px;
             background: #667eea;
@@ -811,8 +737,22 @@ self.addEventListener('fetch', (event) => {
             cursor: pointer;
             text-decoration: none;
             display: inline-block;
-        }}
-    </style>
+        }
+        .back-btn[hidden] {
+            display: none;
+        }
+    """).encode('utf-8')
+_PROCESSING_CSS_GZ = gzip.compress(_PROCESSING_CSS, 9)
+
+# Share-target processing page: minified, %-escaped and encoded once at
+# import; the three %b slots take filename, query string, filename again
+_PROCESSING_PAGE = (_minify_html("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Processing...</title>
+    <link rel="stylesheet" href="/static/processing.css">
 </head>
 <body>
     <div class="container">
@@ -820,7 +760,7 @@ self.addEventListener('fetch', (event) => {
         
         <div id="processing">
             <div class="spinner"></div>
-            <div class="filename">{filename}</div>
+            <div class="filename">@FILENAME@</div>
             <div class="status" id="status">Converting to PDF...</div>
             <p style="font-size: 12px; color: #999; margin-top: 20px;">
                 This may take a few minutes depending on file size
@@ -831,91 +771,754 @@ self.addEventListener('fetch', (event) => {
         
         <div class="error" id="error"></div>
         
-        <a href="/" class="back-btn" id="backBtn">← Back to Upload</a>
+        <a href="/" class="back-btn" id="backBtn" hidden>← Back to Upload</a>
     </div>
 
     <script>
-        async function processFile() {{
-            try {{
-                const response = await fetch('/process?filename={filename_encoded}{lang_param}');
+        async function processFile() {
+            try {
+                const response = await fetch('/process?filename=@QUERY@&probe=1');
+                const data = await response.json();
+                if (!data.success) {
+                    throw new Error(data.error || 'Unknown error');
+                }
                 
-                if (!response.ok) {{
-                    throw new Error('Processing failed');
-                }}
+                // Converted and cached: navigate so the browser streams the
+                // attachment straight to disk instead of buffering a Blob
+                window.location.href = '/process?filename=@QUERY@';
                 
-                const contentType = response.headers.get('content-type');
+                // Show success
+                document.getElementById('processing').style.display = 'none';
+                document.getElementById('success').style.display = 'block';
+                document.getElementById('status').textContent = 'PDF downloaded successfully!';
+                document.getElementById('status').style.color = '#4caf50';
+                document.getElementById('backBtn').hidden = false;
                 
-                if (contentType && contentType.includes('application/pdf')) {{
-                    // Success - download PDF
-                    const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = '{filename}'.replace('.zip', '_transcript.pdf');
-                    document.body.appendChild(a);
-                    a.click();
-                    window.URL.revokeObjectURL(url);
-                    document.body.removeChild(a);
-                    
-                    // Show success
-                    document.getElementById('processing').style.display = 'none';
-                    document.getElementById('success').style.display = 'block';
-                    document.getElementById('status').textContent = 'PDF downloaded successfully!';
-                    document.getElementById('status').style.color = '#4caf50';
-                    document.getElementById('backBtn').style.display = 'inline-block';
-                    
-                    // Auto-redirect after 3 seconds
-                    setTimeout(() => {{
+                // Auto-redirect after 3 seconds, but let the download
+                // handoff finish first on slow devices
+                setTimeout(() => {
+                    if ('requestIdleCallback' in window) {
+                        requestIdleCallback(() => { window.location.href = '/'; }, { timeout: 3000 });
+                    } else {
                         window.location.href = '/';
-                    }}, 3000);
-                }} else {{
-                    const data = await response.json();
-                    throw new Error(data.error || 'Unknown error');
-                }}
-            }} catch (error) {{
+                    }
+                }, 3000);
+            } catch (error) {
                 console.error('Error:', error);
                 document.getElementById('processing').style.display = 'none';
                 document.getElementById('error').style.display = 'block';
                 document.getElementById('error').innerHTML = `
                     <div style="font-size: 48px; margin-bottom: 10px;">❌</div>
                     <h2>Error</h2>
-                    <p style="margin: 10px 0;">${{error.message}}</p>
+                    <p style="margin: 10px 0;">${error.message}</p>
                 `;
-                document.getElementById('backBtn').style.display = 'inline-block';
-            }}
-        }}
+                document.getElementById('backBtn').hidden = false;
+            }
+        }
         
         // Start processing
         processFile();
     </script>
 </body>
-</html>
+</html>""")
+                    .encode('utf-8')
+                    .replace(b'%', b'%%')
+                    .replace(b'@FILENAME@', b'%b')
+                    .replace(b'@QUERY@', b'%b'))
+
+
+def _json_dumps(data):
+    """Compact UTF-8 JSON bytes for API responses."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _safe_zip_name(raw):
+    """Sanitize a client-supplied zip filename.
+
+    Returns the bare file name, or None when it is empty, hides path
+    components or dotfiles, or is not a .zip at all.
+    """
+    name = PurePosixPath(raw.replace('\\', '/')).name
+    if not name or name.startswith('.') or not name.lower().endswith('.zip'):
+        return None
+    return name
+
+
+def _etag(data):
+    """Strong ETag for a static payload (quoted short blake2b digest)."""
+    return '"%s"' % hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+_SW_JS_ETAG = _etag(_SW_JS)
+_MANIFEST_JSON_ETAG = _etag(_MANIFEST_JSON)
+_PROCESSING_CSS_ETAG = _etag(_PROCESSING_CSS)
+
+# Cache-busting: pages reference the constant assets with a build-hash
+# query so browsers may treat them as immutable across deploys
+_ASSET_VER = hashlib.blake2b(_SW_JS + _MANIFEST_JSON + _PROCESSING_CSS,
+                             digest_size=4).hexdigest()
+
+
+def _version_refs(page):
+    """Append ?v=<build hash> to static asset references in a page."""
+    for ref in (b'/manifest.json', b'/icon-192.png', b'/icon-512.png',
+                b'/static/processing.css'):
+        page = page.replace(ref + b'"', ref + b'?v=' + _ASSET_VER.encode() + b'"')
+    return page
+
+
+_INDEX_HTML = _version_refs(_INDEX_HTML)
+_INDEX_HTML_GZ = gzip.compress(_INDEX_HTML, 9)
+_INDEX_HTML_ETAG = _etag(_INDEX_HTML)
+_PROCESSING_PAGE = _version_refs(_PROCESSING_PAGE)
+
+# PNG bytes per icon size, rendered at most once per process
+_icon_cache = {}
+
+
+def _render_icon(size):
+    """Render (or fetch from cache) the PWA icon PNG for one size."""
+    cached = _icon_cache.get(size)
+    if cached is not None:
+        return cached
+
+    # Disk cache: later runs serve the optimized PNG without touching PIL
+    icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '.icon-cache', f'icon-{size}.png')
+    try:
+        with open(icon_path, 'rb') as f:
+            png_data = f.read()
+        _icon_cache[size] = png_data
+        return png_data
+    except OSError:
+        pass
+    if PIL_AVAILABLE:
+        # Create simple icon with gradient
+        img = Image.new('RGB', (size, size), color=(102, 126, 234))
+        draw = ImageDraw.Draw(img)
+
+        # Draw white circle in center
+        margin = size // 4
+        draw.ellipse([margin, margin, size-margin, size-margin], fill='white', outline=(102, 126, 234), width=size//20)
+
+        # Draw chat bubble symbol
+        chat_size = size // 3
+        chat_x = size // 2 - chat_size // 2
+        chat_y = size // 2 - chat_size // 2
+        draw.rounded_rectangle([chat_x, chat_y, chat_x + chat_size, chat_y + chat_size * 0.7],
+                               radius=size//15, fill=(102, 126, 234))
+        # Tail of bubble
+        tail_points = [(chat_x + chat_size * 0.3, chat_y + chat_size * 0.7),
+                      (chat_x + chat_size * 0.2, chat_y + chat_size * 0.9),
+                      (chat_x + chat_size * 0.4, chat_y + chat_size * 0.7)]
+        draw.polygon(tail_points, fill=(102, 126, 234))
+
+        # Save to bytes
+        img_bytes = io.BytesIO()
+        img.save(img_bytes, format='PNG', optimize=True, compress_level=9)
+        png_data = img_bytes.getvalue()
+        try:
+            os.makedirs(os.path.dirname(icon_path), exist_ok=True)
+            with open(icon_path, 'wb') as f:
+                f.write(png_data)
+        except OSError:
+            pass  # read-only install dir: memory cache still applies
+    else:
+        # Fallback: simple solid color PNG if PIL not available
+        png_data = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
+    _icon_cache[size] = png_data
+    return png_data
+
+
+class _MultipartStream:
+    """Minimal streaming parser for multipart/form-data bodies.
+
+    Unlike cgi.FieldStorage it never buffers a whole file part in memory:
+    file bodies are handed to a writer callback in 64KB pieces as they
+    arrive from the socket.
+    """
+
+    CHUNK = 1 << 16
+
+    def __init__(self, rfile, length, boundary):
+        self.rfile = rfile
+        self.remaining = length
+        self.delim = b'\r\n--' + boundary
+        # Virtual CRLF so the first boundary matches the same delimiter
+        self.buf = b'\r\n'
+
+    def _fill(self):
+        if self.remaining:
+            chunk = self.rfile.read(min(self.CHUNK, self.remaining))
+            if not chunk:
+                self.remaining = 0
+                return
+            self.remaining -= len(chunk)
+            self.buf += chunk
+
+    def readline(self):
+        while b'\n' not in self.buf and self.remaining:
+            self._fill()
+        idx = self.buf.find(b'\n')
+        if idx == -1:
+            line, self.buf = self.buf, b''
+        else:
+            line, self.buf = self.buf[:idx + 1], self.buf[idx + 1:]
+        return line
+
+    def copy_part(self, write):
+        """Stream one part body to write(); True when the final boundary
+        (--boundary--) terminated it."""
+        keep = len(self.delim) + 4
+        while True:
+            idx = self.buf.find(self.delim)
+            if idx != -1:
+                write(self.buf[:idx])
+                self.buf = self.buf[idx + len(self.delim):]
+                while b'\n' not in self.buf and self.remaining:
+                    self._fill()
+                closing = self.buf.startswith(b'--')
+                eol = self.buf.find(b'\n')
+                self.buf = self.buf[eol + 1:] if eol != -1 else b''
+                return closing
+            if not self.remaining:
+                write(self.buf)
+                self.buf = b''
+                return True
+            if len(self.buf) > keep:
+                write(self.buf[:-keep])
+                self.buf = self.buf[-keep:]
+            self._fill()
+
+    def drain(self):
+        """Consume whatever is left of the body (closing dashes,
+        epilogue) so a kept-alive connection starts the next request
+        clean."""
+        while self.remaining:
+            chunk = self.rfile.read(min(self.CHUNK, self.remaining))
+            if not chunk:
+                break
+            self.remaining -= len(chunk)
+        self.remaining = 0
+        self.buf = b''
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    # Keep-alive: mobile clients reuse one connection for the whole
+    # upload -> poll -> download flow instead of re-handshaking (every
+    # response declares Content-Length, which HTTP/1.1 framing needs)
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Serve the upload form, PWA assets, or download PDF"""
+        # One split instead of a full urlparse; only /process has a query
+        path, _, query = self.path.partition('?')
+
+        # Handle processing endpoint
+        if path == '/process':
+            params = parse_qs(query)
+            
+            filename = params.get('filename', [''])[0]
+            language = params.get('language', [''])[0]
+            probe = params.get('probe', [''])[0] == '1'
+            
+            if not filename:
+                self.send_json_response({'success': False, 'error': 'No filename provided'})
+                return
+            
+            filename = _safe_zip_name(filename)
+            if not filename:
+                self.send_json_response({'success': False, 'error': 'Invalid filename'})
+                return
+            
+            filepath = os.path.join('uploads', filename)
+            
+            if not os.path.exists(filepath):
+                self.send_json_response({'success': False, 'error': 'File not found'})
+                return
+            
+            # Process the file
+            keep_upload = False
+            try:
+                keep_upload = self._convert_and_send(filepath, filename, language, probe)
+            
+            except ConversionTimeout:
+                self.send_json_response({
+                    'success': False,
+                    'error': 'Processing timeout (>10 minutes)'
+                })
+            except Exception as e:
+                self.send_json_response({
+                    'success': False,
+                    'error': str(e)
+                })
+            finally:
+                # Clean up uploaded file (a successful probe leaves it
+                # for the follow-up download request)
+                if not keep_upload:
+                    try:
+                        os.remove(filepath)
+                    except FileNotFoundError:
+                        pass
+            
+            return
+        
+        # Resumable upload status: /upload/<id>/status
+        match = re.fullmatch(r'/upload/([0-9a-f-]+)/status', path)
+        if match:
+            session = _load_session(match.group(1))
+            if session is None:
+                self.send_json_response({'success': False, 'error': 'Unknown upload id'})
+                return
+            self.send_json_response({'success': True, 'size': session['size'],
+                                     'received': session['received']})
+            return
+
+        # Static assets dispatch through the route table below
+        handler = self._GET_ROUTES.get(path)
+        if handler:
+            handler(self, query)
+            return
+
+        self.send_error(404)
+
+    def _send_static(self, body, gz_body, content_type, etag=None, versioned=False):
+        """Send a precomputed static payload, gzip-encoded when accepted.
+
+        With an etag, a matching If-None-Match gets a bodyless 304 so
+        PWA revalidation checks cost a few header bytes instead of the
+        full asset; version-stamped requests skip even that by being
+        marked immutable.
+        """
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        encoding = None
+        if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            body, encoding = gz_body, 'gzip'
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        if etag:
+            self.send_header('ETag', etag)
+            if versioned:
+                self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+            else:
+                self.send_header('Cache-Control', 'public, max-age=86400, must-revalidate')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_index(self, query):
+        self._send_static(_INDEX_HTML, _INDEX_HTML_GZ, 'text/html; charset=utf-8',
+                          etag=_INDEX_HTML_ETAG)
+
+    def _serve_sw(self, query):
+        self._send_static(_SW_JS, _SW_JS_GZ, 'application/javascript',
+                          etag=_SW_JS_ETAG)
+
+    def _serve_manifest(self, query):
+        self._send_static(_MANIFEST_JSON, _MANIFEST_JSON_GZ, 'application/json',
+                          etag=_MANIFEST_JSON_ETAG,
+                          versioned=query == 'v=' + _ASSET_VER)
+
+    def _serve_processing_css(self, query):
+        self._send_static(_PROCESSING_CSS, _PROCESSING_CSS_GZ, 'text/css',
+                          etag=_PROCESSING_CSS_ETAG,
+                          versioned=query == 'v=' + _ASSET_VER)
+
+    def _serve_icon(self, query):
+        # Icons are rendered once per size, then cached. Decide the size
+        # from the path alone: the ?v= asset hash could contain "192"
+        size = 192 if '192' in self.path.partition('?')[0] else 512
+        png_data = _render_icon(size)
+        etag = _etag(png_data)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-type', 'image/png')
+        self.send_header('Content-Length', str(len(png_data)))
+        if query == 'v=' + _ASSET_VER:
+            self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        else:
+            self.send_header('Cache-Control', 'public, max-age=31536000')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(png_data)
+
+    # O(1) dispatch for the constant-path GETs; /process and the
+    # resumable-upload status endpoint keep their parsing above
+    _GET_ROUTES = {
+        '/': _serve_index,
+        '/index.html': _serve_index,
+        '/sw.js': _serve_sw,
+        '/manifest.json': _serve_manifest,
+        '/static/processing.css': _serve_processing_css,
+        '/icon-192.png': _serve_icon,
+        '/icon-512.png': _serve_icon,
+    }
+
+    def _ingest_upload(self):
+        """Validate and stream a multipart upload into uploads/.
+
+        Returns (filename, language); filename is None when an error
+        response has already been sent.
+        """
+        content_type = self.headers.get('Content-Type') or ''
+        if 'multipart/form-data' not in content_type:
+            self.send_json_response({'success': False, 'error': 'Invalid content type'})
+            return None, ''
+        os.makedirs('uploads', exist_ok=True)
+        filename, fields = self._stream_multipart('uploads')
+        if not filename:
+            self.send_json_response({'success': False, 'error': 'No file uploaded'})
+            return None, ''
+        return filename, fields.get('language', '')
+
+    def _convert_and_send(self, filepath, filename, language, probe=False):
+        """Convert one saved zip and answer with the PDF or a JSON error.
+
+        With probe=True only the conversion happens (result parked in
+        the PDF cache) and the answer is JSON; the client then fetches
+        the PDF by navigation so the browser streams it to disk.
         """
+        output_pdf = filename[:-4] + '_transcript.pdf'
+        digest = _file_sha256(filepath)
+        cached = _cached_pdf_path(digest, language)
+        if os.path.exists(cached):
+            print(f"Cache hit: {filepath}")
+            if probe:
+                # Keep the upload: the client comes right back without
+                # probe=1 to stream the cached PDF
+                self.send_json_response({'success': True})
+                return True
+            self._send_pdf_file(cached, output_pdf)
+            return
+        if not _job_slots.acquire(blocking=False):
+            self.send_json_response({'success': False,
+                                     'error': 'Server busy, try again shortly'},
+                                    status=429)
+            return
+        output_path = _staged_pdf_path()
+        print(f"Converting: {filepath} -> {output_path}")
+        handed_off = False
+        try:
+            future = _get_convert_pool().submit(
+                _convert_in_worker, filepath, output_path, language or None)
+            try:
+                result = future.result(timeout=600)
+            except ConversionTimeout:
+                # The worker keeps running; its slot, staged file and
+                # eventual result now belong to the done-callback
+                future.add_done_callback(
+                    lambda f: _finish_abandoned(f, cached, output_path))
+                handed_off = True
+                raise
+            print(f"Status: {result['status']}")
+
+            if result['status'] == 'success':
+                _store_cached_pdf(cached, output_path)
+                if probe:
+                    self.send_json_response({'success': True})
+                    return True
+                # The open() inside is the existence check; unlink-on-open
+                # cleans the PDF up
+                self._send_pdf_file(output_path, output_pdf, unlink=True)
+            else:
+                error_msg = result.get('error') or 'Unknown error'
+                self.send_json_response({
+                    'success': False,
+                    'error': f'Processing failed: {error_msg}'
+                })
+        finally:
+            if not handed_off:
+                _job_slots.release()
+                # The staged file is pre-created by mkstemp, so every
+                # non-success path leaves one behind without this
+                try:
+                    os.unlink(output_path)
+                except FileNotFoundError:
+                    pass
+
+    def _send_pdf_file(self, output_path, download_name, unlink=False):
+        """Stream a PDF response with zero-copy sendfile when available.
+
+        With unlink=True the path is removed as soon as the file is open:
+        the fd keeps the data alive for the transfer and the file is
+        reclaimed even if the client disconnects mid-stream.
+        """
+        with open(output_path, 'rb') as f:
+            if unlink:
+                os.unlink(output_path)
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(200)
+            self.send_header('Content-type', 'application/pdf')
+            self.send_header('Content-Disposition', f'attachment; filename="{download_name}"')
+            self.send_header('Content-Length', str(size))
+            self.end_headers()
+            self.wfile.flush()
+            try:
+                # socket.sendfile uses os.sendfile and falls back to
+                # plain send() internally when the platform lacks it
+                self.connection.sendfile(f)
+            except (AttributeError, ValueError):
+                shutil.copyfileobj(f, self.wfile, length=1 << 20)
+
+    def _stream_multipart(self, upload_dir):
+        """Stream a multipart upload to disk.
+
+        Returns (saved filename or None, dict of plain form fields).
+        """
+        ctype = self.headers.get('Content-Type', '')
+        match = re.search(r'boundary="?([^";,\s]+)"?', ctype)
+        if not match:
+            return None, {}
+        length = int(self.headers.get('Content-Length') or 0)
+        stream = _MultipartStream(self.rfile, length,
+                                  match.group(1).encode('latin-1'))
+
+        # Discard the preamble up to the first boundary
+        if stream.copy_part(lambda _data: None):
+            stream.drain()
+            return None, {}
+
+        filename = None
+        fields = {}
+        while True:
+            disposition = b''
+            while True:
+                line = stream.readline()
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+                if line.lower().startswith(b'content-disposition'):
+                    disposition = line
+            name_m = re.search(rb'name="([^"]*)"', disposition)
+            file_m = re.search(rb'filename="([^"]*)"', disposition)
+            if file_m and file_m.group(1):
+                part_name = _safe_zip_name(file_m.group(1).decode('utf-8', 'replace'))
+                if part_name:
+                    with open(os.path.join(upload_dir, part_name), 'wb') as out:
+                        _advise_sequential(out.fileno())
+                        closing = stream.copy_part(out.write)
+                    filename = part_name
+                else:
+                    # Unusable name: drain the part and move on
+                    closing = stream.copy_part(lambda _data: None)
+            else:
+                pieces = []
+                closing = stream.copy_part(pieces.append)
+                if name_m:
+                    fields[name_m.group(1).decode('utf-8', 'replace')] = \
+                        b''.join(pieces).decode('utf-8', 'replace')
+            if closing:
+                stream.drain()
+                return filename, fields
+
+    def do_POST(self):
+        """Handle file upload"""
+        # Resumable upload: create a session and preallocate the file
+        if self.path == '/upload/initiate':
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length) or b'{}')
+                filename = _safe_zip_name(params.get('filename') or '')
+                size = int(params.get('size') or 0)
+                if not filename or size <= 0:
+                    self.send_json_response({'success': False, 'error': 'valid .zip filename and size required'})
+                    return
+                os.makedirs(_PARTIAL_DIR, exist_ok=True)
+                upload_id = str(uuid.uuid4())
+                with open(os.path.join(_PARTIAL_DIR, upload_id + '.zip'), 'wb') as f:
+                    f.truncate(size)
+                _save_session(upload_id, {'filename': filename, 'size': size, 'received': []})
+                self.send_json_response({'success': True, 'upload_id': upload_id})
+            except Exception as e:
+                self.send_json_response({'success': False, 'error': str(e)})
+            return
+
+        # Resumable upload: all ranges in -> move into uploads/
+        match = re.fullmatch(r'/upload/([0-9a-f-]+)/complete', self.path)
+        if match:
+            upload_id = match.group(1)
+            session = _load_session(upload_id)
+            if session is None:
+                self.send_json_response({'success': False, 'error': 'Unknown upload id'})
+                return
+            received = session['received']
+            if received != [[0, session['size'] - 1]]:
+                self.send_json_response({'success': False, 'error': 'Upload incomplete',
+                                         'received': received})
+                return
+            filepath = os.path.join('uploads', session['filename'])
+            os.replace(os.path.join(_PARTIAL_DIR, upload_id + '.zip'), filepath)
+            os.remove(os.path.join(_PARTIAL_DIR, upload_id + '.meta.json'))
+            with _resumable_lock:
+                _resumable.pop(upload_id, None)
+            self.send_json_response({'success': True, 'filename': session['filename']})
+            return
+
+        # Handle WhatsApp share
+        if self.path == '/share':
+            try:
+                filename, language = self._ingest_upload()
+                if not filename:
+                    return
+
+                print(f"📱 File shared from WhatsApp: {os.path.join('uploads', filename)}")
+                
+                # Show processing page; /process picks the file up later
+                self.send_processing_page(filename, language)
+                return
+
+            except Exception as e:
+                print(f"Error: {e}")
+                traceback.print_exc()
+                self.send_json_response({
+                    'success': False,
+                    'error': str(e)
+                })
+            return
         
-        self.wfile.write(html.encode('utf-8'))
+        # Handle normal upload
+        if self.path == '/upload':
+            filepath = None
+            try:
+                filename, language = self._ingest_upload()
+                if not filename:
+                    return
+                filepath = os.path.join('uploads', filename)
+
+                self._convert_and_send(filepath, filename, language)
 
-    def send_json_response(self, data):
+            except ConversionTimeout:
+                self.send_json_response({
+                    'success': False,
+                    'error': 'Processing timeout (>10 minutes)'
+                })
+            except Exception as e:
+                print(f"Error: {e}")
+                traceback.print_exc()
+                self.send_json_response({
+                    'success': False,
+                    'error': str(e)
+                })
+            finally:
+                # Clean up uploaded file
+                if filepath:
+                    try:
+                        os.remove(filepath)
+                    except FileNotFoundError:
+                        pass
+
+    def do_PUT(self):
+        """Receive one chunk of a resumable upload at its byte offset"""
+        match = re.fullmatch(r'/upload/([0-9a-f-]+)', self.path)
+        if not match:
+            self.send_json_response({'success': False, 'error': 'Not found'})
+            return
+        upload_id = match.group(1)
+        session = _load_session(upload_id)
+        if session is None:
+            self.send_json_response({'success': False, 'error': 'Unknown upload id'})
+            return
+        range_m = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)',
+                               self.headers.get('Content-Range') or '')
+        if not range_m:
+            self.send_json_response({'success': False, 'error': 'Content-Range required'})
+            return
+        start, end = int(range_m.group(1)), int(range_m.group(2))
+        length = int(self.headers.get('Content-Length') or 0)
+        if end >= session['size'] or length != end - start + 1:
+            self.send_json_response({'success': False, 'error': 'Invalid range'})
+            return
+        with open(os.path.join(_PARTIAL_DIR, upload_id + '.zip'), 'r+b') as f:
+            _advise_sequential(f.fileno())
+            f.seek(start)
+            remaining = length
+            while remaining:
+                chunk = self.rfile.read(min(1 << 16, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        # Only record what actually hit the disk: crediting the full
+        # range after a short read would make the resuming client skip
+        # bytes that never arrived and /complete accept a ZIP with a hole
+        written = length - remaining
+        if written:
+            session['received'] = _merge_ranges(session['received'],
+                                                start, start + written - 1)
+            _save_session(upload_id, session)
+        if remaining:
+            self.send_json_response({'success': False,
+                                     'error': 'Incomplete chunk',
+                                     'received': session['received']})
+            return
+        self.send_json_response({'success': True, 'received': session['received']})
+
+    def send_processing_page(self, filename, language):
+        """Send processing page that handles conversion and download"""
+        name = filename.encode('utf-8')
+        query = quote(filename).encode('utf-8')
+        if language:
+            query += b'&language=' + quote(language).encode('utf-8')
+        body = _PROCESSING_PAGE % (name, query, query)
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json_response(self, data, status=None):
         """Send JSON response"""
-        import json
-        self.send_response(200 if data.get('success') else 400)
+        if not data.get('success'):
+            # Error paths can bail before reading the whole request
+            # body; close rather than let the next request parse it
+            self.close_connection = True
+        body = _json_dumps(data)
+        self.send_response(status or (200 if data.get('success') else 400))
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
 
     def log_message(self, format, *args):
-        """Custom logging"""
-        print(f"[{self.address_string()}] {format % args}")
+        """Custom logging, queued so the request thread never blocks"""
+        _access_log.info("[%s] %s", self.address_string(), format % args)
 
 
+@lru_cache(maxsize=1)
 def get_local_ip():
-    """Get local IP address"""
+    """Get local IP address (memoized; the UDP probe costs a syscall)"""
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # UDP connect is just a local route lookup, but cap it anyway so
+        # an odd resolver/netfilter setup can never stall startup
+        s.settimeout(0.2)
         s.connect(("8.8.8.8", 80))
         ip = s.getsockname()[0]
         s.close()
         return ip
     except:
+        # Offline LAN: no route toward the probe target, but the phone
+        # can still reach us — try the hostname's own addresses before
+        # giving up and printing a useless loopback URL
+        try:
+            for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+                ip = info[4][0]
+                if not ip.startswith('127.'):
+                    return ip
+        except OSError:
+            pass
         return "127.0.0.1"
 
 
@@ -1131,7 +1734,10 @@ def main():
         print(f"\n🔧 Press Ctrl+C to stop the server\n")
         print("=" * 60)
 
-    server = HTTPServer((args.host, port), UploadHandler)
+    # Threaded server: a long conversion no longer blocks icon/manifest
+    # requests or a second upload
+    server = ThreadingHTTPServer((args.host, port), UploadHandler)
+    server.daemon_threads = True
     
     try:
         server.serve_forever()